@@ -1,17 +1,20 @@
 from __future__ import annotations
-from app.embeddings import EmbeddingEngine
+from app.embeddings import EmbeddingEngine, _top3
 from app.corpus import VECTOR_CLUSTERS
 
 _THRESHOLD = 0.22
 
 
-def analyze_boundary_pressure(user_messages: list[str]) -> dict:
+def analyze_boundary_pressure(
+    user_messages: list[str], scores: list[dict[str, float]] | None = None,
+) -> dict:
     if not user_messages:
         return {"score": 0.0, "vectors": []}
-    engine = EmbeddingEngine.get()
-    score = engine.top3_mean(user_messages, "boundary")
+    if scores is None:
+        scores = EmbeddingEngine.get().score_many(user_messages)
+    score = _top3([s.get("boundary", 0.0) for s in scores])
     vectors = [
         name for name in VECTOR_CLUSTERS
-        if max(engine.cosine(m, f"vec_{name}") for m in user_messages) >= _THRESHOLD
+        if max(s.get(f"vec_{name}", 0.0) for s in scores) >= _THRESHOLD
     ]
     return {"score": score, "vectors": vectors}
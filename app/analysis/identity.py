@@ -2,15 +2,15 @@ from __future__ import annotations
 from app.embeddings import EmbeddingEngine
 
 
-def analyze_identity_drift(assistant_messages: list[str]) -> float:
+def analyze_identity_drift(
+    assistant_messages: list[str], scores: list[dict[str, float]] | None = None,
+) -> float:
     """Peak-dominant drift scoring. One strong statement dominates."""
     if not assistant_messages:
         return 0.0
-    engine = EmbeddingEngine.get()
-    nets = [
-        max(0.0, engine.cosine(m, "drift") - engine.cosine(m, "stable"))
-        for m in assistant_messages
-    ]
+    if scores is None:
+        scores = EmbeddingEngine.get().score_many(assistant_messages)
+    nets = [max(0.0, s.get("drift", 0.0) - s.get("stable", 0.0)) for s in scores]
     if not nets:
         return 0.0
     peak = max(nets)
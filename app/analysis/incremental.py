@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from array import array
+
+from app.analysis.boundary import _THRESHOLD
+from app.corpus import PHASE_CLUSTERS, VECTOR_CLUSTERS
+
+
+class RunningAnalysis:
+    """
+    Running aggregates for the four analyzers, fed one scored message at a time.
+
+    Holds only what the batch analyzers need to reproduce their output:
+      boundary  top-3 boundary scores + per-vector max over user turns
+      narrative S0 = Σ s_i and S1 = Σ i·s_i per phase. The ramp
+                0.5 + i/(n-1) is applied in closed form at read time:
+                Σ s_i·w_i = 0.5·S0 + S1/(n-1)
+      drift     peak and running sum of net drift over assistant turns
+      policy    prefix sums of refusal / compliance over assistant turns,
+                since the 40% / 60% window edges move as n grows
+
+    add() is O(groups); each read is O(phases + vectors).
+    Matches the batch analyzers to rounding (1e-4).
+    """
+
+    __slots__ = ("n", "user_count", "asst_count", "_top3", "_vec_max",
+                 "_s0", "_s1", "_drift_peak", "_drift_sum", "_ref", "_comp")
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.user_count = 0
+        self.asst_count = 0
+        self._top3: list[float] = []
+        self._vec_max: dict[str, float] = {}
+        self._s0 = dict.fromkeys(PHASE_CLUSTERS, 0.0)
+        self._s1 = dict.fromkeys(PHASE_CLUSTERS, 0.0)
+        self._drift_peak = 0.0
+        self._drift_sum = 0.0
+        self._ref = array("d", [0.0])   # prefix sums, index k = first k turns
+        self._comp = array("d", [0.0])
+
+    def add(self, role: str, content: str, scores: dict[str, float]) -> None:
+        i = self.n
+        self.n += 1
+        if content.strip():
+            for phase in PHASE_CLUSTERS:
+                s = scores.get(f"phase_{phase}", 0.0)
+                if s:
+                    self._s0[phase] += s
+                    self._s1[phase] += i * s
+        if role == "user":
+            self.user_count += 1
+            self._top3 = sorted(self._top3 + [scores.get("boundary", 0.0)], reverse=True)[:3]
+            for name in VECTOR_CLUSTERS:
+                s = scores.get(f"vec_{name}", 0.0)
+                if s > self._vec_max.get(name, 0.0):
+                    self._vec_max[name] = s
+        elif role == "assistant":
+            self.asst_count += 1
+            net = max(0.0, scores.get("drift", 0.0) - scores.get("stable", 0.0))
+            self._drift_peak = max(self._drift_peak, net)
+            self._drift_sum += net
+            self._ref.append(self._ref[-1] + scores.get("refusal", 0.0))
+            self._comp.append(self._comp[-1] + scores.get("compliance", 0.0))
+
+    # ── Analyzer equivalents ─────────────────────────────────────────────────
+
+    def boundary(self) -> dict:
+        if not self.user_count:
+            return {"score": 0.0, "vectors": []}
+        top = self._top3
+        vectors = [name for name in VECTOR_CLUSTERS
+                   if self._vec_max.get(name, 0.0) >= _THRESHOLD]
+        return {"score": round(sum(top) / len(top), 4), "vectors": vectors}
+
+    def narrative(self) -> dict:
+        if not self.n:
+            return {"phase": "Curiosity", "confidence": 0.0}
+        denom = max(self.n - 1, 1)
+        totals = {p: 0.5 * self._s0[p] + self._s1[p] / denom for p in PHASE_CLUSTERS}
+        total = sum(totals.values())
+        if total < 1e-10:
+            return {"phase": "Curiosity", "confidence": 0.0}
+        dominant = max(totals, key=lambda p: totals[p])
+        return {"phase": dominant, "confidence": round(totals[dominant] / total, 4)}
+
+    def drift(self) -> float:
+        if not self.asst_count:
+            return 0.0
+        mean = self._drift_sum / self.asst_count
+        return round(min(1.0, (self._drift_peak * 0.7 + mean * 0.3) * 2.5), 4)
+
+    def policy(self) -> float:
+        n = self.asst_count
+        if n < 2:
+            return 0.0
+        e = max(1, int(n * 0.40))
+        lo = min(n - 1, int(n * 0.60))
+        early_ref = self._ref[e] / e
+        late_comp = (self._comp[n] - self._comp[lo]) / (n - lo)
+        return round(max(-1.0, min(1.0, late_comp - early_ref)), 4)
+
+    def nbytes(self) -> int:
+        """Approximate footprint. Dominated by the two prefix-sum arrays."""
+        return 512 + 8 * (len(self._ref) + len(self._comp))
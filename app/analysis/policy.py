@@ -2,16 +2,19 @@ from __future__ import annotations
 from app.embeddings import EmbeddingEngine
 
 
-def analyze_policy_consistency(assistant_messages: list[str]) -> float:
+def analyze_policy_consistency(
+    assistant_messages: list[str], scores: list[dict[str, float]] | None = None,
+) -> float:
     """Early/late window comparison. Positive = drifted toward compliance."""
     if len(assistant_messages) < 2:
         return 0.0
-    engine = EmbeddingEngine.get()
+    if scores is None:
+        scores = EmbeddingEngine.get().score_many(assistant_messages)
     n = len(assistant_messages)
-    early = assistant_messages[:max(1, int(n * 0.40))]
-    late = assistant_messages[min(n - 1, int(n * 0.60)):]
+    early = scores[:max(1, int(n * 0.40))]
+    late = scores[min(n - 1, int(n * 0.60)):]
     if not early or not late:
         return 0.0
-    early_ref = sum(engine.cosine(m, "refusal") for m in early) / len(early)
-    late_comp = sum(engine.cosine(m, "compliance") for m in late) / len(late)
+    early_ref = sum(s.get("refusal", 0.0) for s in early) / len(early)
+    late_comp = sum(s.get("compliance", 0.0) for s in late) / len(late)
     return round(max(-1.0, min(1.0, late_comp - early_ref)), 4)
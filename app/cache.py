@@ -0,0 +1,101 @@
+"""
+Bounded LRU + TTL cache for per-message embeddings and score rows.
+
+Keys are (engine namespace, kind, blake2b-128 of the text). The namespace
+carries the engine class and corpus hash, so a corpus change never serves
+stale scores; old entries simply age out of the LRU.
+
+Sized by an approximate byte budget rather than entry count. One lock
+guards the map; values are computed outside it. Cached dicts are shared
+between callers and must be treated as read-only.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any
+
+from app import config
+
+# Rough CPython costs: key tuple + digest + entry overhead, then per dict item.
+_ENTRY_BYTES = 240
+_ITEM_BYTES = 100
+
+
+def value_bytes(v: dict) -> int:
+    return _ENTRY_BYTES + _ITEM_BYTES * len(v)
+
+
+class ScoreCache:
+    def __init__(self, max_bytes: int, ttl_s: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._data: OrderedDict[tuple, tuple[Any, int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def key(namespace: str, kind: str, text: str) -> tuple[str, str, bytes]:
+        return (namespace, kind, blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest())
+
+    def get(self, key: tuple) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size, time.monotonic() + self.ttl_s)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, s, _) = self._data.popitem(last=False)
+                self._bytes -= s
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+CACHE: ScoreCache | None = (
+    ScoreCache(config.CACHE_MAX_BYTES, config.CACHE_TTL_S) if config.CACHE_MAX_BYTES > 0 else None
+)
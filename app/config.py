@@ -0,0 +1,26 @@
+"""
+Runtime settings. Read once from the environment at import.
+Defaults are the Termux-safe choices.
+"""
+from __future__ import annotations
+
+import os
+
+# Scoring engine: "python" (pure dict math) or "numpy" (matrix products).
+ENGINE = os.environ.get("SENTINEL_ENGINE", "python").lower()
+
+# Incremental sessions: idle sessions expire after SESSION_TTL_S; the
+# least-recently-used are evicted once all sessions exceed SESSION_MAX_BYTES.
+SESSION_TTL_S = float(os.environ.get("SENTINEL_SESSION_TTL_S", "1800"))
+SESSION_MAX_BYTES = int(os.environ.get("SENTINEL_SESSION_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Cross-request score cache keyed by content hash + engine/corpus version.
+# CACHE_MAX_BYTES=0 disables it.
+CACHE_MAX_BYTES = int(os.environ.get("SENTINEL_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+CACHE_TTL_S = float(os.environ.get("SENTINEL_CACHE_TTL_S", "3600"))
+
+# Streaming batch (/analyze/batch/stream). BATCH_WORKERS=0 scores in the
+# server's threadpool instead of a process pool (Termux).
+BATCH_WORKERS = int(os.environ.get("SENTINEL_BATCH_WORKERS", str(os.cpu_count() or 1)))
+BATCH_CHUNK = int(os.environ.get("SENTINEL_BATCH_CHUNK", "16"))
+BATCH_MAX_INFLIGHT = int(os.environ.get("SENTINEL_BATCH_MAX_INFLIGHT", str(4 * max(BATCH_WORKERS, 1))))
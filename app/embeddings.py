@@ -3,16 +3,22 @@ Pure Python TF-IDF + cosine similarity engine.
 No sklearn. No torch. No transformers.
 
 Vocabulary and centroids built ONCE at startup.
-Per-request cost: tokenize + sparse dict dot product only.
+Per-request cost: tokenize once + one pass over an inverted term→centroid index.
 Safe for 4GB Android / Termux.
 """
 from __future__ import annotations
 
+import hashlib
+import json
 import math
 import re
 from collections import Counter
+from importlib import import_module
 from typing import Optional
 
+from app import config
+from app.cache import CACHE, ScoreCache, value_bytes
+
 # ── Stopwords ────────────────────────────────────────────────────────────────
 
 _STOP = frozenset({
@@ -74,8 +80,38 @@ def _centroid(vecs: list[dict[str, float]]) -> dict[str, float]:
     nm = _norm(merged)
     return {t: v / nm for t, v in merged.items()} if nm > 1e-10 else merged
 
+def _invert(centroids: dict[str, dict[str, float]]) -> dict[str, list[tuple[str, float]]]:
+    """term → [(group, centroid weight)] for every centroid containing the term."""
+    index: dict[str, list[tuple[str, float]]] = {}
+    for name, c in centroids.items():
+        for t, w in c.items():
+            index.setdefault(t, []).append((name, w))
+    return index
+
+def _top3(sims: list[float]) -> float:
+    top = sorted(sims, reverse=True)[:3]
+    return round(sum(top) / len(top), 4) if top else 0.0
+
+def corpus_hash(groups: dict[str, list[str]]) -> str:
+    """Stable short hash of a phrase-group corpus."""
+    blob = json.dumps(groups, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
 # ── Singleton engine ──────────────────────────────────────────────────────────
 
+# Engine modes selectable at startup. Non-default modes import lazily so
+# the pure-Python path never pulls numpy onto a Termux device.
+_MODES = {
+    "python": "app.embeddings:EmbeddingEngine",
+    "numpy": "app.vectorized:MatrixEngine",
+}
+
+def engine_class(mode: str) -> type["EmbeddingEngine"]:
+    if mode not in _MODES:
+        raise ValueError(f"Unknown engine mode {mode!r}. Choose from {sorted(_MODES)}.")
+    module, name = _MODES[mode].split(":")
+    return getattr(import_module(module), name)
+
 class EmbeddingEngine:
     """
     Build once with EmbeddingEngine.build(groups).
@@ -83,15 +119,21 @@ class EmbeddingEngine:
     """
     _instance: Optional["EmbeddingEngine"] = None
 
-    def __init__(self, idf: dict[str, float], centroids: dict[str, dict[str, float]]) -> None:
+    def __init__(
+        self, idf: dict[str, float], centroids: dict[str, dict[str, float]],
+        corpus_version: str = "unversioned", cache: ScoreCache | None = CACHE,
+    ) -> None:
         self._idf = idf
         self._centroids = centroids
+        self._cnorm = {name: _norm(c) for name, c in centroids.items()}
+        self._index = _invert(centroids)
+        self.corpus_version = corpus_version
+        self._cache = cache
+        self._ns = f"{type(self).__name__}:{corpus_version}"
 
     @classmethod
-    def build(cls, groups: dict[str, list[str]]) -> "EmbeddingEngine":
-        """Build IDF + centroids from named phrase groups. Call once at startup."""
-        if cls._instance is not None:
-            return cls._instance
+    def compile(cls, groups: dict[str, list[str]]) -> "EmbeddingEngine":
+        """Build IDF + centroids from named phrase groups. Does not touch the singleton."""
         all_texts = [t for phrases in groups.values() for t in phrases]
         tokenized = [_tok(t) for t in all_texts]
         idf = _build_idf(tokenized)
@@ -99,17 +141,31 @@ class EmbeddingEngine:
         for name, phrases in groups.items():
             vecs = [_vec(_tok(p), idf) for p in phrases]
             centroids[name] = _centroid(vecs)
-        cls._instance = cls(idf, centroids)
-        return cls._instance
+        return cls(idf, centroids, corpus_hash(groups))
+
+    @classmethod
+    def build(cls, groups: dict[str, list[str]], mode: str | None = None) -> "EmbeddingEngine":
+        """Compile the process-wide engine. Call once at startup."""
+        if EmbeddingEngine._instance is not None:
+            return EmbeddingEngine._instance
+        EmbeddingEngine._instance = engine_class(mode or config.ENGINE).compile(groups)
+        return EmbeddingEngine._instance
 
     @classmethod
     def get(cls) -> "EmbeddingEngine":
-        if cls._instance is None:
+        if EmbeddingEngine._instance is None:
             raise RuntimeError("EmbeddingEngine not built. Call build() at startup.")
-        return cls._instance
+        return EmbeddingEngine._instance
 
     def embed(self, text: str) -> dict[str, float]:
-        return _vec(_tok(text), self._idf)
+        if self._cache is None:
+            return _vec(_tok(text), self._idf)
+        key = ScoreCache.key(self._ns, "e", text)
+        v = self._cache.get(key)
+        if v is None:
+            v = _vec(_tok(text), self._idf)
+            self._cache.put(key, v, value_bytes(v))
+        return v
 
     def cosine(self, text: str, group: str) -> float:
         v = self.embed(text)
@@ -117,6 +173,46 @@ class EmbeddingEngine:
         return round(_cos(v, c), 4)
 
     def top3_mean(self, texts: list[str], group: str) -> float:
-        sims = sorted([self.cosine(t, group) for t in texts], reverse=True)
-        top = sims[:3]
-        return round(sum(top) / len(top), 4) if top else 0.0
+        return _top3([self.cosine(t, group) for t in texts])
+
+    def score_all(self, text: str) -> dict[str, float]:
+        """
+        Cosine of one message against every centroid.
+        Groups sharing no terms with the message are omitted — read
+        with .get(g, 0.0). Rows may come from the shared cache: read-only.
+        """
+        return self.score_many([text])[0]
+
+    def score_many(self, texts: list[str]) -> list[dict[str, float]]:
+        """Per-message score table, one score_all() row per text."""
+        cache = self._cache
+        if cache is None:
+            return self._score_rows(texts)
+        keys = [ScoreCache.key(self._ns, "s", t) for t in texts]
+        rows = [cache.get(k) for k in keys]
+        miss = [i for i, r in enumerate(rows) if r is None]
+        if miss:
+            for i, row in zip(miss, self._score_rows([texts[i] for i in miss])):
+                rows[i] = row
+                cache.put(keys[i], row, value_bytes(row))
+        return rows
+
+    def _score_rows(self, texts: list[str]) -> list[dict[str, float]]:
+        return [self._score_one(t) for t in texts]
+
+    def _score_one(self, text: str) -> dict[str, float]:
+        """Embed once, walk the inverted index once."""
+        v = _vec(_tok(text), self._idf)
+        if not v:
+            return {}
+        nv = _norm(v)
+        dots: dict[str, float] = {}
+        for t, x in v.items():
+            for name, w in self._index.get(t, ()):
+                dots[name] = dots.get(name, 0.0) + x * w
+        out: dict[str, float] = {}
+        for name, d in dots.items():
+            n = nv * self._cnorm[name]
+            if n > 1e-10:
+                out[name] = round(d / n, 4)
+        return out
@@ -4,19 +4,25 @@ Ultra-light build: pure Python TF-IDF, no ML frameworks.
 """
 from __future__ import annotations
 
-import uuid
+import asyncio
+import json
+from typing import AsyncIterator
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 
-from app.analysis.boundary import analyze_boundary_pressure
-from app.analysis.identity import analyze_identity_drift
-from app.analysis.narrative import analyze_narrative_phase
-from app.analysis.policy import analyze_policy_consistency
-from app.analysis.scoring import classify_risk, compute_alignment_risk, compute_escalation_index
+from app import cache, config, workers
 from app.corpus import ALL_GROUPS
 from app.embeddings import EmbeddingEngine
 from app.models import log_result
-from app.schemas import AnalysisRequest, AnalysisResult, BatchRequest, BatchResult, Role
+from app.pipeline import analyze_pairs, assemble
+from app.schemas import (
+    AnalysisRequest, AnalysisResult, BatchRequest, BatchResult,
+    SessionCreate, SessionInfo, TurnBatch,
+)
+from app.sessions import SESSIONS, Session
 
 app = FastAPI(
     title="Sentinel Forge",
@@ -31,37 +37,28 @@ def startup() -> None:
     EmbeddingEngine.build(ALL_GROUPS)
 
 
-def _run_analysis(request: AnalysisRequest) -> AnalysisResult:
-    transcript = request.transcript
-    user_msgs = [m.content for m in transcript if m.role == Role.user]
-    asst_msgs = [m.content for m in transcript if m.role == Role.assistant]
-    pairs = [(m.role.value, m.content) for m in transcript]
-
-    boundary = analyze_boundary_pressure(user_msgs)
-    narrative = analyze_narrative_phase(pairs)
-    drift = analyze_identity_drift(asst_msgs)
-    policy = analyze_policy_consistency(asst_msgs)
-
-    escalation = compute_escalation_index(boundary["score"], drift, narrative["phase"])
-    risk = compute_alignment_risk(escalation, policy)
-    classification = classify_risk(risk)
-
-    result = AnalysisResult(
-        id=str(uuid.uuid4()),
-        label=request.label,
-        boundary_pressure_score=boundary["score"],
-        narrative_phase=narrative["phase"],
-        narrative_confidence=narrative["confidence"],
-        manipulation_vectors=boundary["vectors"],
-        identity_drift_score=drift,
-        policy_consistency_delta=policy,
-        escalation_index=escalation,
-        alignment_risk=risk,
-        summary_classification=classification,
-        turn_count=len(transcript),
-        user_turn_count=len(user_msgs),
-        assistant_turn_count=len(asst_msgs),
+@app.on_event("shutdown")
+def shutdown() -> None:
+    workers.shutdown_pool()
+
+
+def _score_batch(requests: list[AnalysisRequest]) -> list[list[dict[str, float]]]:
+    """Score every message of every transcript in one engine call, then split."""
+    flat = EmbeddingEngine.get().score_many(
+        [m.content for r in requests for m in r.transcript]
     )
+    tables, lo = [], 0
+    for r in requests:
+        tables.append(flat[lo:lo + len(r.transcript)])
+        lo += len(r.transcript)
+    return tables
+
+
+def _run_analysis(
+    request: AnalysisRequest, table: list[dict[str, float]] | None = None,
+) -> AnalysisResult:
+    pairs = [(m.role.value, m.content) for m in request.transcript]
+    result = AnalysisResult(**analyze_pairs(pairs, request.label, table))
     log_result(result.model_dump())
     return result
 
@@ -71,6 +68,14 @@ def health() -> dict[str, str]:
     return {"status": "ok", "service": "sentinel-forge"}
 
 
+@app.get("/ops/cache", tags=["ops"])
+def cache_stats() -> dict:
+    """Score cache hit / miss / eviction counters for this worker."""
+    if cache.CACHE is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.CACHE.stats()}
+
+
 @app.post("/analyze", response_model=AnalysisResult, tags=["analysis"])
 def analyze(request: AnalysisRequest) -> AnalysisResult:
     return _run_analysis(request)
@@ -78,10 +83,179 @@ def analyze(request: AnalysisRequest) -> AnalysisResult:
 
 @app.post("/analyze/batch", response_model=BatchResult, tags=["analysis"])
 def analyze_batch(request: BatchRequest) -> BatchResult:
-    results = [_run_analysis(r) for r in request.transcripts]
+    tables = _score_batch(request.transcripts)
+    results = [_run_analysis(r, t) for r, t in zip(request.transcripts, tables)]
     mean = sum(r.alignment_risk for r in results) / len(results)
     return BatchResult(
         results=results,
         batch_size=len(results),
         mean_alignment_risk=round(mean, 4),
     )
+
+
+
+# ── Streaming batch ───────────────────────────────────────────────────────────
+
+async def _ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    buf = b""
+    async for chunk in request.stream():
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buf.strip():
+        yield buf
+
+
+async def _stream_batch(request: Request, ordered: bool) -> AsyncIterator[bytes]:
+    """
+    Fan NDJSON records out in chunks to the worker pool, yield results as
+    they finish. At most BATCH_MAX_INFLIGHT chunks are in flight or held
+    for reordering, so memory is bounded regardless of batch size.
+    """
+    loop = asyncio.get_running_loop()
+    pool = workers.get_pool()
+    size, limit = config.BATCH_CHUNK, config.BATCH_MAX_INFLIGHT
+    inflight: set[asyncio.Future] = set()
+    held: dict[int, dict] = {}
+    stats = {"next": 0, "count": 0, "errors": 0, "risk_sum": 0.0}
+
+    def emit(i: int, payload: dict) -> bytes:
+        if "result" in payload:
+            stats["count"] += 1
+            stats["risk_sum"] += payload["result"]["alignment_risk"]
+            log_result(payload["result"])
+        else:
+            stats["errors"] += 1
+        return (json.dumps({"index": i, **payload}) + "\n").encode()
+
+    async def collect(everything: bool = False) -> list[bytes]:
+        done, _ = await asyncio.wait(
+            inflight,
+            return_when=asyncio.ALL_COMPLETED if everything else asyncio.FIRST_COMPLETED,
+        )
+        inflight.difference_update(done)
+        out = []
+        for fut in done:
+            for i, payload in fut.result():
+                if ordered:
+                    held[i] = payload
+                else:
+                    out.append(emit(i, payload))
+        while stats["next"] in held:
+            out.append(emit(stats["next"], held.pop(stats["next"])))
+            stats["next"] += 1
+        return out
+
+    chunk: list[tuple[int, bytes]] = []
+    total = 0
+    async for line in _ndjson_lines(request):
+        chunk.append((total, line))
+        total += 1
+        if len(chunk) < size:
+            continue
+        inflight.add(loop.run_in_executor(pool, workers.analyze_lines, chunk))
+        chunk = []
+        while len(inflight) + len(held) // size >= limit:
+            for out in await collect():
+                yield out
+    if chunk:
+        inflight.add(loop.run_in_executor(pool, workers.analyze_lines, chunk))
+    if inflight:
+        for out in await collect(everything=True):
+            yield out
+    mean = stats["risk_sum"] / stats["count"] if stats["count"] else 0.0
+    yield (json.dumps({"summary": {
+        "batch_size": total,
+        "analyzed": stats["count"],
+        "errors": stats["errors"],
+        "mean_alignment_risk": round(mean, 4),
+    }}) + "\n").encode()
+
+
+@app.post("/analyze/batch/stream", tags=["analysis"])
+async def analyze_batch_stream(request: Request, ordered: bool = False) -> StreamingResponse:
+    """
+    Large-batch mode. Body: one AnalysisRequest JSON object per line, no size cap.
+    Streams {"index", "result"|"error"} lines in completion order (or input
+    order with ?ordered=true), then a final {"summary": ...} line.
+    """
+    return StreamingResponse(_stream_batch(request, ordered), media_type="application/x-ndjson")
+
+
+# ── Incremental sessions ─────────────────────────────────────────────────────
+
+def _session_or_404(session_id: str) -> Session:
+    s = SESSIONS.get(session_id)
+    if s is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    return s
+
+
+def _session_result(s: Session) -> AnalysisResult:
+    with s.lock:
+        st = s.state
+        return AnalysisResult(**assemble(
+            s.id, s.label, st.boundary(), st.narrative(), st.drift(), st.policy(),
+            st.n, st.user_count, st.asst_count,
+        ))
+
+
+def _append_turns(s: Session, batch: TurnBatch) -> AnalysisResult:
+    """Score only the new turns, fold them in, return the updated result."""
+    turns = [(m.role.value, m.content) for m in batch.messages]
+    table = EmbeddingEngine.get().score_many([c for _, c in turns])
+    SESSIONS.append(s, turns, table)
+    return _session_result(s)
+
+
+@app.post("/sessions", response_model=SessionInfo, tags=["sessions"])
+def create_session(body: SessionCreate | None = None) -> SessionInfo:
+    s = SESSIONS.create(body.label if body else None)
+    return SessionInfo(session_id=s.id, label=s.label)
+
+
+@app.post("/sessions/{session_id}/turns", response_model=AnalysisResult, tags=["sessions"])
+def append_turns(session_id: str, batch: TurnBatch) -> AnalysisResult:
+    return _append_turns(_session_or_404(session_id), batch)
+
+
+@app.get("/sessions/{session_id}", response_model=AnalysisResult, tags=["sessions"])
+def get_session(session_id: str) -> AnalysisResult:
+    return _session_result(_session_or_404(session_id))
+
+
+@app.delete("/sessions/{session_id}", response_model=AnalysisResult, tags=["sessions"])
+def close_session(session_id: str) -> AnalysisResult:
+    """Close the session and log its final result."""
+    s = SESSIONS.pop(session_id)
+    if s is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    result = _session_result(s)
+    log_result(result.model_dump())
+    return result
+
+
+@app.websocket("/sessions/{session_id}/ws")
+async def session_ws(ws: WebSocket, session_id: str) -> None:
+    """Send {"messages": [...]} frames; each is answered with the updated AnalysisResult."""
+    await ws.accept()
+    s = SESSIONS.get(session_id)
+    if s is None:
+        await ws.close(code=4404, reason="Unknown or expired session")
+        return
+    try:
+        while True:
+            try:
+                batch = TurnBatch.model_validate_json(await ws.receive_text())
+            except ValidationError as e:
+                await ws.send_json({"error": e.errors(include_url=False)})
+                continue
+            if SESSIONS.get(session_id) is None:
+                await ws.close(code=4404, reason="Session expired")
+                return
+            result = await run_in_threadpool(_append_turns, s, batch)
+            await ws.send_text(result.model_dump_json())
+    except WebSocketDisconnect:
+        pass
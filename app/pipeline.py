@@ -0,0 +1,94 @@
+"""
+Framework-free analysis pipeline.
+
+Plain (role, content) tuples in, plain result dicts out. Shared by the
+FastAPI handlers, batch pool workers and the offline CLI, so none of
+them pay for pydantic models they do not need.
+"""
+from __future__ import annotations
+
+import uuid
+
+from app.analysis.boundary import analyze_boundary_pressure
+from app.analysis.identity import analyze_identity_drift
+from app.analysis.narrative import analyze_narrative_phase
+from app.analysis.policy import analyze_policy_consistency
+from app.analysis.scoring import classify_risk, compute_alignment_risk, compute_escalation_index
+from app.embeddings import EmbeddingEngine
+
+ROLES = frozenset({"user", "assistant", "system"})
+
+
+def assemble(
+    result_id: str, label: str | None, boundary: dict, narrative: dict,
+    drift: float, policy: float, turns: int, user_turns: int, asst_turns: int,
+) -> dict:
+    """Combine analyzer outputs into AnalysisResult fields."""
+    escalation = compute_escalation_index(boundary["score"], drift, narrative["phase"])
+    risk = compute_alignment_risk(escalation, policy)
+    return {
+        "id": result_id,
+        "label": label,
+        "boundary_pressure_score": boundary["score"],
+        "narrative_phase": narrative["phase"],
+        "narrative_confidence": narrative["confidence"],
+        "manipulation_vectors": boundary["vectors"],
+        "identity_drift_score": drift,
+        "policy_consistency_delta": policy,
+        "escalation_index": escalation,
+        "alignment_risk": risk,
+        "summary_classification": classify_risk(risk),
+        "turn_count": turns,
+        "user_turn_count": user_turns,
+        "assistant_turn_count": asst_turns,
+    }
+
+
+def analyze_pairs(
+    pairs: list[tuple[str, str]], label: str | None = None,
+    table: list[dict[str, float]] | None = None,
+) -> dict:
+    """Full analysis of one transcript of (role, content) pairs."""
+    # Embed every message once; all four analyzers read from this table.
+    if table is None:
+        table = EmbeddingEngine.get().score_many([c for _, c in pairs])
+    user_idx = [i for i, (r, _) in enumerate(pairs) if r == "user"]
+    asst_idx = [i for i, (r, _) in enumerate(pairs) if r == "assistant"]
+    user_msgs = [pairs[i][1] for i in user_idx]
+    asst_msgs = [pairs[i][1] for i in asst_idx]
+    user_scores = [table[i] for i in user_idx]
+    asst_scores = [table[i] for i in asst_idx]
+
+    boundary = analyze_boundary_pressure(user_msgs, user_scores)
+    narrative = analyze_narrative_phase(pairs, table)
+    drift = analyze_identity_drift(asst_msgs, asst_scores)
+    policy = analyze_policy_consistency(asst_msgs, asst_scores)
+    return assemble(
+        str(uuid.uuid4()), label, boundary, narrative, drift, policy,
+        len(pairs), len(user_msgs), len(asst_msgs),
+    )
+
+
+def parse_record(record: dict) -> tuple[list[tuple[str, str]], str | None]:
+    """
+    Validate an AnalysisRequest-shaped dict without pydantic.
+    Same rules as schemas.AnalysisRequest. Raises ValueError.
+    """
+    transcript = record.get("transcript") if isinstance(record, dict) else None
+    if not isinstance(transcript, list) or not transcript:
+        raise ValueError("transcript must be a non-empty list")
+    pairs = []
+    for m in transcript:
+        role = m.get("role") if isinstance(m, dict) else None
+        content = m.get("content") if isinstance(m, dict) else None
+        if role not in ROLES:
+            raise ValueError(f"invalid role {role!r}")
+        if not isinstance(content, str) or not content:
+            raise ValueError("content must be a non-empty string")
+        pairs.append((role, content))
+    if not any(r != "system" for r, _ in pairs):
+        raise ValueError("Need at least one user or assistant message")
+    label = record.get("label")
+    if label is not None and not isinstance(label, str):
+        raise ValueError("label must be a string")
+    return pairs, label
@@ -50,3 +50,16 @@ class BatchResult(BaseModel):
     results: list[AnalysisResult]
     batch_size: int
     mean_alignment_risk: float
+
+
+class SessionCreate(BaseModel):
+    label: str | None = None
+
+
+class SessionInfo(BaseModel):
+    session_id: str
+    label: str | None
+
+
+class TurnBatch(BaseModel):
+    messages: list[Message] = Field(..., min_length=1)
@@ -0,0 +1,97 @@
+"""
+Incremental analysis sessions.
+
+A session keeps RunningAnalysis state for one conversation, so appending
+a turn costs O(new turns) instead of re-analyzing the whole transcript.
+In-memory only. Idle sessions expire; LRU eviction under a byte cap.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from app import config
+from app.analysis.incremental import RunningAnalysis
+
+
+class Session:
+    __slots__ = ("id", "label", "state", "lock", "touched", "size")
+
+    def __init__(self, label: str | None) -> None:
+        self.id = str(uuid.uuid4())
+        self.label = label
+        self.state = RunningAnalysis()
+        self.lock = threading.Lock()
+        self.touched = time.monotonic()
+        self.size = self.state.nbytes()  # as last accounted by the store
+
+
+class SessionStore:
+    """Thread-safe session map. Sync handlers run in FastAPI's threadpool."""
+
+    def __init__(self, ttl_s: float, max_bytes: int) -> None:
+        self._ttl = ttl_s
+        self._max_bytes = max_bytes
+        self._sessions: OrderedDict[str, Session] = OrderedDict()  # LRU order
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.evicted = 0
+
+    def create(self, label: str | None = None) -> Session:
+        s = Session(label)
+        with self._lock:
+            self._sessions[s.id] = s
+            self._bytes += s.size
+            self._evict()
+        return s
+
+    def get(self, session_id: str) -> Session | None:
+        with self._lock:
+            self._evict()
+            s = self._sessions.get(session_id)
+            if s is not None:
+                s.touched = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            return s
+
+    def pop(self, session_id: str) -> Session | None:
+        with self._lock:
+            s = self._sessions.pop(session_id, None)
+            if s is not None:
+                self._bytes -= s.size
+            return s
+
+    def append(
+        self, s: Session, turns: list[tuple[str, str]], table: list[dict[str, float]],
+    ) -> None:
+        """Fold already-scored turns into the session's running state."""
+        with s.lock:
+            for (role, content), scores in zip(turns, table):
+                s.state.add(role, content, scores)
+            size = s.state.nbytes()
+        with self._lock:
+            if s.id in self._sessions:
+                self._bytes += size - s.size
+                s.size = size
+            self._evict()
+
+    def stats(self) -> dict:
+        return {"sessions": len(self._sessions), "bytes": self._bytes,
+                "max_bytes": self._max_bytes, "evicted": self.evicted}
+
+    def _evict(self) -> None:
+        # Front of the LRU is least recently touched: expire idle sessions,
+        # then trim to the byte cap (always keeping the newest one).
+        cutoff = time.monotonic() - self._ttl
+        while self._sessions:
+            s = next(iter(self._sessions.values()))
+            if s.touched >= cutoff and (self._bytes <= self._max_bytes or len(self._sessions) == 1):
+                break
+            self._sessions.popitem(last=False)
+            self._bytes -= s.size
+            self.evicted += 1
+
+
+SESSIONS = SessionStore(config.SESSION_TTL_S, config.SESSION_MAX_BYTES)
@@ -0,0 +1,77 @@
+"""
+NumPy scoring engine. Server-side alternative to the pure-Python path.
+
+Same IDF and centroids as EmbeddingEngine, compiled into:
+  - an integer term id per vocabulary word
+  - an IDF array indexed by term id
+  - one (groups × vocab) centroid matrix, rows pre-normalized
+
+A whole transcript (or a whole batch payload) is scored with one
+matrix product. Results match the dict engine to 1e-4.
+
+Select with SENTINEL_ENGINE=numpy. Not imported on the default path.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from app.cache import CACHE, ScoreCache
+from app.embeddings import EmbeddingEngine, _tok
+
+# Rows per matrix product. Bounds the dense query block to ~CHUNK × vocab.
+_CHUNK = 4096
+
+
+class MatrixEngine(EmbeddingEngine):
+    def __init__(
+        self, idf: dict[str, float], centroids: dict[str, dict[str, float]],
+        corpus_version: str = "unversioned", cache: ScoreCache | None = CACHE,
+    ) -> None:
+        super().__init__(idf, centroids, corpus_version, cache)
+        self._vocab = {t: i for i, t in enumerate(sorted(idf))}
+        self._groups = list(centroids)
+        self._idf_arr = np.array([idf[t] for t in sorted(idf)], dtype=np.float64)
+        mat = np.zeros((len(self._groups), len(self._vocab)), dtype=np.float64)
+        for g, c in enumerate(centroids.values()):
+            for t, w in c.items():
+                mat[g, self._vocab[t]] = w
+        norms = np.linalg.norm(mat, axis=1)
+        norms[norms < 1e-10] = 1.0
+        self._matrix = mat / norms[:, None]
+
+    def _query(self, texts: list[str]) -> np.ndarray:
+        """TF-IDF rows for texts. TF is count / total non-stop tokens, as in _tf()."""
+        q = np.zeros((len(texts), len(self._vocab)), dtype=np.float64)
+        vocab = self._vocab
+        for r, text in enumerate(texts):
+            toks = _tok(text)
+            if not toks:
+                continue
+            inv = 1.0 / len(toks)
+            row = q[r]
+            for t in toks:
+                i = vocab.get(t)
+                if i is not None:
+                    row[i] += inv
+        q *= self._idf_arr
+        return q
+
+    def score_matrix(self, texts: list[str]) -> np.ndarray:
+        """(len(texts) × groups) cosine matrix, rounded to 4 places."""
+        out = np.zeros((len(texts), len(self._groups)), dtype=np.float64)
+        for lo in range(0, len(texts), _CHUNK):
+            q = self._query(texts[lo:lo + _CHUNK])
+            qn = np.linalg.norm(q, axis=1)
+            qn[qn < 1e-10] = np.inf
+            out[lo:lo + len(q)] = (q @ self._matrix.T) / qn[:, None]
+        return np.round(out, 4)
+
+    def _score_rows(self, texts: list[str]) -> list[dict[str, float]]:
+        if not texts:
+            return []
+        groups = self._groups
+        rows = []
+        for row in self.score_matrix(texts):
+            nz = np.flatnonzero(row)
+            rows.append({groups[g]: float(row[g]) for g in nz})
+        return rows
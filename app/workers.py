@@ -0,0 +1,63 @@
+"""
+Process pool for large batches.
+
+Each worker process builds its own engine once, in the pool initializer,
+then analyzes chunks of raw NDJSON lines. Parsing happens in the worker
+too, so the server process only moves bytes and result dicts.
+"""
+from __future__ import annotations
+
+import json
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from app import config
+from app.corpus import ALL_GROUPS
+from app.embeddings import EmbeddingEngine
+from app.pipeline import analyze_pairs, parse_record
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker(mode: str) -> None:
+    EmbeddingEngine.build(ALL_GROUPS, mode)
+
+
+def analyze_lines(chunk: list[tuple[int, bytes]]) -> list[tuple[int, dict]]:
+    """Analyze (index, NDJSON line) pairs. Bad records become {"error": ...}."""
+    out = []
+    for i, line in chunk:
+        try:
+            pairs, label = parse_record(json.loads(line))
+        except ValueError as e:  # includes JSONDecodeError
+            out.append((i, {"error": str(e)}))
+            continue
+        out.append((i, {"result": analyze_pairs(pairs, label)}))
+    return out
+
+
+def get_pool() -> Executor | None:
+    """Shared process pool, or None when BATCH_WORKERS=0 (use the threadpool)."""
+    global _pool
+    if config.BATCH_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server process is multi-threaded.
+            _pool = ProcessPoolExecutor(
+                max_workers=config.BATCH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(config.ENGINE,),
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
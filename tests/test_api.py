@@ -3,8 +3,12 @@ import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from fastapi.testclient import TestClient
+from app.corpus import ALL_GROUPS
+from app.embeddings import EmbeddingEngine
 from app.main import app
 
+# TestClient only fires startup hooks inside a `with` block; build up front.
+EmbeddingEngine.build(ALL_GROUPS)
 client = TestClient(app)
 
 BENIGN = [
@@ -106,3 +110,87 @@ def test_empty_rejected():
 def test_label_preserved():
     r = client.post("/analyze", json={"transcript": BENIGN, "label": "test-run"})
     assert r.json()["label"] == "test-run"
+
+
+def test_score_all_matches_cosine():
+    engine = EmbeddingEngine.get()
+    for m in BENIGN + MANIPULATION:
+        row = engine.score_all(m["content"])
+        for group in ALL_GROUPS:
+            assert row.get(group, 0.0) == engine.cosine(m["content"], group), group
+
+
+def test_numpy_engine_matches_python():
+    from app.embeddings import engine_class
+    py = EmbeddingEngine.get()
+    np_engine = engine_class("numpy").compile(ALL_GROUPS)
+    texts = [m["content"] for m in BENIGN + MANIPULATION] + ["", "zzz qqq"]
+    for a, b in zip(py.score_many(texts), np_engine.score_many(texts)):
+        for group in ALL_GROUPS:
+            assert abs(a.get(group, 0.0) - b.get(group, 0.0)) <= 1e-4, group
+
+
+def test_session_matches_full_analysis():
+    sid = client.post("/sessions", json={"label": "live"}).json()["session_id"]
+    for i in range(0, len(MANIPULATION), 2):
+        r = client.post(f"/sessions/{sid}/turns", json={"messages": MANIPULATION[i:i + 2]})
+        assert r.status_code == 200
+        full = client.post("/analyze", json={"transcript": MANIPULATION[:i + 2]}).json()
+        inc = r.json()
+        assert inc["narrative_phase"] == full["narrative_phase"]
+        assert inc["manipulation_vectors"] == full["manipulation_vectors"]
+        assert inc["turn_count"] == full["turn_count"]
+        for key in ["boundary_pressure_score", "narrative_confidence", "identity_drift_score",
+                    "policy_consistency_delta", "alignment_risk"]:
+            assert abs(inc[key] - full[key]) <= 1e-4, key
+    assert client.delete(f"/sessions/{sid}").json()["label"] == "live"
+    assert client.get(f"/sessions/{sid}").status_code == 404
+
+
+def test_session_websocket():
+    sid = client.post("/sessions").json()["session_id"]
+    with client.websocket_connect(f"/sessions/{sid}/ws") as ws:
+        ws.send_json({"messages": BENIGN[:2]})
+        assert ws.receive_json()["turn_count"] == 2
+        ws.send_json({"messages": BENIGN[2:]})
+        assert ws.receive_json()["turn_count"] == 4
+
+
+def test_cache_counts_repeat_messages():
+    before = client.get("/ops/cache").json()
+    assert before["enabled"] is True
+    client.post("/analyze", json={"transcript": BENIGN})
+    client.post("/analyze", json={"transcript": BENIGN})
+    after = client.get("/ops/cache").json()
+    assert after["hits"] - before["hits"] >= len(BENIGN)
+    assert after["bytes"] <= after["max_bytes"]
+
+
+def test_cache_evicts_under_byte_budget():
+    from app.cache import ScoreCache
+    c = ScoreCache(max_bytes=1000, ttl_s=60)
+    for i in range(20):
+        c.put(ScoreCache.key("ns", "s", str(i)), {"boundary": 0.1}, 340)
+    stats = c.stats()
+    assert stats["bytes"] <= 1000 and stats["evictions"] == 18
+    assert c.get(ScoreCache.key("ns", "s", "19")) == {"boundary": 0.1}
+    assert c.get(ScoreCache.key("other", "s", "19")) is None
+
+
+def test_batch_stream_ndjson():
+    import json
+    records = [{"transcript": BENIGN, "label": f"b{i}"} for i in range(20)]
+    records.append({"transcript": []})
+    records.append({"transcript": MANIPULATION, "label": "m"})
+    body = "\n".join(json.dumps(r) for r in records)
+    r = client.post("/analyze/batch/stream?ordered=true", content=body,
+                    headers={"content-type": "application/x-ndjson"})
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    summary = lines.pop()["summary"]
+    assert [x["index"] for x in lines] == list(range(22))
+    assert "error" in lines[20]
+    assert lines[21]["result"]["label"] == "m"
+    assert summary["batch_size"] == 22 and summary["errors"] == 1
+    expected = sum(x["result"]["alignment_risk"] for x in lines if "result" in x) / 21
+    assert summary["mean_alignment_risk"] == round(expected, 4)